@@ -0,0 +1,73 @@
+"""
+Benchmark feature engineering: the old groupby/merge pipeline vs feature_utils.
+Reports wall time and peak traced memory (numpy and pandas buffers) per row count.
+
+    python ml/benchmark_features.py [rows ...]
+"""
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+from feature_utils import numeric_cols, cat_cols, training_features
+
+
+def make_incidents(n, seed=0):
+    """Synthetic SF-shaped feed: string timestamps, a dense ~0.02 degree box, a few bad rows."""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64('2018-12-24T00:00')
+    minutes = rng.integers(0, 3 * 366 * 24 * 60, n)
+    stamps = (start + minutes.astype('timedelta64[m]')).astype(str).astype(object)
+    lat = np.round(37.70 + rng.random(n) * 0.02, 4).astype(object)
+    lon = np.round(-122.45 + rng.random(n) * 0.02, 4).astype(object)
+    # Sprinkle in the bad rows the SF feed contains
+    stamps[::97] = None
+    lat[::89] = None
+    lon[::83] = 'n/a'
+    return lat, lon, stamps
+
+
+def legacy_features(lat, lon, stamps):
+    """Previous train_model groupby/merge pipeline, kept as the parity reference."""
+    df = pd.DataFrame({'latitude': lat, 'longitude': lon, 'incident_datetime': stamps})
+    df['latitude'] = pd.to_numeric(df['latitude'], errors='coerce')
+    df['longitude'] = pd.to_numeric(df['longitude'], errors='coerce')
+    df = df.dropna(subset=['latitude', 'longitude'])
+    df['incident_datetime'] = pd.to_datetime(df['incident_datetime'], errors='coerce')
+    df['incident_hour'] = df['incident_datetime'].dt.hour
+    df['incident_day_of_week'] = df['incident_datetime'].dt.day_name()
+    df['incident_week'] = df['incident_datetime'].dt.isocalendar().week
+    df['incident_year'] = df['incident_datetime'].dt.year
+    df['hour_sin'] = np.sin(2 * np.pi * df['incident_hour'] / 24)
+    df['hour_cos'] = np.cos(2 * np.pi * df['incident_hour'] / 24)
+    df['lat_bin'] = (df['latitude'] * 100).round(1)
+    df['lon_bin'] = (df['longitude'] * 100).round(1)
+    keys = ['incident_year', 'incident_week', 'lat_bin', 'lon_bin']
+    counts = df.groupby(keys).size().rename('count_week').reset_index()
+    counts['risk_label'] = pd.qcut(np.log1p(counts['count_week']), 3, labels=False, duplicates='drop')
+    df = df.merge(counts[keys + ['risk_label']], on=keys, how='left')
+    df = df.dropna(subset=['risk_label'])
+    return df[numeric_cols + cat_cols], df['risk_label']
+
+
+def measure(fn, *args):
+    # Timed and traced separately: tracemalloc slows the object-column parsing a lot
+    start = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [50_000, 1_000_000, 5_000_000]
+    print(f"{'rows':>10} {'impl':>8} {'time (s)':>9} {'peak (MiB)':>11}")
+    for n in sizes:
+        data = make_incidents(n)
+        for name, fn in (('legacy', legacy_features), ('vector', training_features)):
+            elapsed, peak = measure(fn, *data)
+            print(f"{n:>10} {name:>8} {elapsed:>9.2f} {peak:>11.1f}")
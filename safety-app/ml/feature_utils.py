@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+# Feature columns used for prediction
+numeric_cols = ['latitude', 'longitude', 'hour_sin', 'hour_cos']
+cat_cols = ['incident_day_of_week']
+
+DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+_DAY_CODES = {name: code for code, name in enumerate(DAY_NAMES)}
+# Never seen in training, so OneHotEncoder(handle_unknown='ignore') encodes it as all zeros,
+# same as the raw unknown strings it used to receive
+UNKNOWN_DAY_CODE = len(DAY_NAMES)
+_DAY_CATEGORIES = DAY_NAMES + ('<unknown>',)
+
+# Cyclic hour encoding, indexed by hour of day (0-23)
+HOUR_SIN = np.sin(2 * np.pi * np.arange(24) / 24)
+HOUR_COS = np.cos(2 * np.pi * np.arange(24) / 24)
+
+# Spatial bins are 0.001 degree cells (the old `round(lat * 100, 1)` bins),
+# shifted to be non-negative so they can be packed into one int64 key:
+#   [ year : 16 bits | iso week : 6 bits | lat cell : 20 bits | lon cell : 20 bits ]
+_LAT_OFFSET = 90 * 1000
+_LON_OFFSET = 180 * 1000
+_YEAR_OFFSET = 2**15
+_CELL_BITS = 20
+_WEEK_BITS = 6
+
+
+def encode_day_of_week(day_of_week):
+    """
+    Map day names ('Monday', ...) to int8 codes 0-6; anything else maps to UNKNOWN_DAY_CODE.
+    """
+    names = np.atleast_1d(np.asarray(day_of_week, dtype=object))
+    return np.fromiter((_DAY_CODES.get(name, UNKNOWN_DAY_CODE) for name in names), dtype=np.int8, count=len(names))
+
+
+def encode_cells(latitude, longitude):
+    """
+    Pack latitude/longitude into int64 spatial cell keys.
+    Returns (keys, valid) where valid is False for missing or out-of-range coordinates.
+    """
+    lat = np.asarray(latitude, dtype=np.float64)
+    lon = np.asarray(longitude, dtype=np.float64)
+    valid = (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+    # Scale in two steps, as `round(x * 100, 1)` did, so cells match the old bins exactly
+    lat_q = np.rint(np.where(valid, lat, 0) * 100 * 10).astype(np.int64) + _LAT_OFFSET
+    lon_q = np.rint(np.where(valid, lon, 0) * 100 * 10).astype(np.int64) + _LON_OFFSET
+    return (lat_q << _CELL_BITS) | lon_q, valid
+
+
+def split_datetimes(incident_datetime):
+    """
+    Break timestamps into small-int calendar fields without pandas accessors.
+    Timezone-aware input keeps its local wall time, like `.dt.hour` does.
+    Returns dict of arrays: hour, day_of_week (0=Monday), week (ISO), year, valid.
+    """
+    ts = pd.DatetimeIndex(pd.to_datetime(incident_datetime, errors='coerce'))
+    if ts.tz is not None:
+        ts = ts.tz_localize(None)
+    ts = ts.to_numpy()
+    # Work in the parsed resolution; casting to ns would overflow past 2262
+    unit, _ = np.datetime_data(ts.dtype)
+    ticks_per_hour = np.timedelta64(1, 'h') // np.timedelta64(1, unit)
+    valid = ~np.isnat(ts)
+    ticks = np.where(valid, ts.view(np.int64), 0)
+    hours = ticks // ticks_per_hour
+    days = hours // 24
+    hour = (hours % 24).astype(np.int8)
+    # 1970-01-01 was a Thursday
+    day_of_week = ((days + 3) % 7).astype(np.int8)
+    # ISO week number is set by the Thursday of the same Monday-based week
+    thursday = (days - day_of_week + 3).astype('datetime64[D]')
+    week = ((thursday - thursday.astype('datetime64[Y]')).astype(np.int64) // 7 + 1).astype(np.int8)
+    year = days.astype('datetime64[D]').astype('datetime64[Y]').astype(np.int64) + 1970
+    return {
+        'hour': hour,
+        'day_of_week': day_of_week,
+        'week': week,
+        'year': year.astype(np.int16),
+        'valid': valid,
+    }
+
+
+def week_cell_counts(year, week, cells):
+    """
+    Count incidents per (year, ISO week, cell) group with a single sort.
+    Returns (group_counts, inverse) where group_counts[inverse] is each row's count.
+    """
+    year_week = (year.astype(np.int64) + _YEAR_OFFSET) << _WEEK_BITS | week.astype(np.int64)
+    keys = year_week << (2 * _CELL_BITS) | cells
+    _, inverse, group_counts = np.unique(keys, return_inverse=True, return_counts=True)
+    return group_counts, inverse.reshape(-1)
+
+
+def feature_frame(latitude, longitude, hour, day_codes):
+    """
+    Build the model input frame. Shared by training and inference so both see identical features.
+    Args:
+        latitude, longitude: float arrays
+        hour: int array, hours of day (wrapped modulo 24)
+        day_codes: int array from encode_day_of_week
+    """
+    hour = np.asarray(hour, dtype=np.int64) % 24
+    return pd.DataFrame({
+        'latitude': np.asarray(latitude, dtype=np.float64),
+        'longitude': np.asarray(longitude, dtype=np.float64),
+        'hour_sin': HOUR_SIN[hour],
+        'hour_cos': HOUR_COS[hour],
+        'incident_day_of_week': pd.Categorical.from_codes(np.asarray(day_codes, dtype=np.int8), _DAY_CATEGORIES),
+    })
+
+
+def training_features(latitude, longitude, incident_datetime):
+    """
+    Turn raw incident columns into the training feature frame and risk labels.
+    Rows with bad coordinates or timestamps are dropped.
+    Returns:
+        (X, y): feature DataFrame and int risk labels (0=lowest, 2=highest)
+    """
+    lat = pd.to_numeric(latitude, errors='coerce')
+    lon = pd.to_numeric(longitude, errors='coerce')
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    cells, cells_valid = encode_cells(lat, lon)
+    t = split_datetimes(incident_datetime)
+    keep = cells_valid & t['valid']
+    if not keep.all():
+        lat, lon, cells = lat[keep], lon[keep], cells[keep]
+        t = {name: values[keep] for name, values in t.items()}
+
+    # Risk labels: tertiles of log weekly incident count per cell
+    group_counts, inverse = week_cell_counts(t['year'], t['week'], cells)
+    group_labels = pd.qcut(np.log1p(group_counts), 3, labels=False, duplicates='drop')[inverse]
+    # qcut leaves every label NaN when all groups have the same count
+    labeled = ~np.isnan(group_labels)
+    if not labeled.all():
+        lat, lon, group_labels = lat[labeled], lon[labeled], group_labels[labeled]
+        t = {name: values[labeled] for name, values in t.items()}
+    y = group_labels.astype(np.int64)
+
+    X = feature_frame(lat, lon, t['hour'], t['day_of_week'])
+    return X, y
@@ -0,0 +1,111 @@
+import unittest
+from unittest import mock
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+ml_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ml'))
+if ml_path not in sys.path:
+    sys.path.insert(0, ml_path)
+import feature_utils
+import model_utils
+from benchmark_features import legacy_features, make_incidents
+
+
+class FeatureUtilsTestCase(unittest.TestCase):
+    def assert_matches_legacy(self, lat, lon, stamps):
+        X, y = feature_utils.training_features(lat, lon, stamps)
+        X_old, y_old = legacy_features(lat, lon, stamps)
+        self.assertEqual(len(X), len(X_old))
+        self.assertEqual(len(y), len(y_old))
+        for col in feature_utils.numeric_cols:
+            np.testing.assert_allclose(X[col].to_numpy(), X_old[col].to_numpy(), atol=1e-12)
+        np.testing.assert_array_equal(X['incident_day_of_week'].astype(str).to_numpy(),
+                                      X_old['incident_day_of_week'].to_numpy())
+        np.testing.assert_array_equal(y, y_old.to_numpy().astype(np.int64))
+
+    def test_matches_legacy_pipeline(self):
+        self.assert_matches_legacy(*make_incidents(20000))
+
+    def test_equal_group_sizes_drop_all_rows(self):
+        # qcut cannot split identical counts, so the old dropna removed every row
+        self.assert_matches_legacy([37.77], [-122.42], ['2023-03-01T10:00:00'])
+        self.assert_matches_legacy([37.77, 37.71], [-122.42, -122.40],
+                                   ['2023-03-01T10:00:00', '2023-03-01T11:00:00'])
+        X, y = feature_utils.training_features([37.77, 37.71], [-122.42, -122.40],
+                                               ['2023-03-01T10:00:00', '2023-03-01T11:00:00'])
+        self.assertEqual(len(X), 0)
+        self.assertEqual(y.dtype, np.int64)
+
+    def test_iso_week_at_year_boundary(self):
+        stamps = ['2018-12-31T01:00:00', '2020-01-01T00:00:00', '2021-01-03T23:59:00', '2026-12-31T12:00:00',
+                  '2500-01-01T10:00:00', '1900-01-01T05:00:00']
+        fields = feature_utils.split_datetimes(stamps)
+        expected = pd.to_datetime(pd.Series(stamps))
+        np.testing.assert_array_equal(fields['week'], expected.dt.isocalendar().week.to_numpy())
+        np.testing.assert_array_equal(fields['year'], expected.dt.year.to_numpy())
+        np.testing.assert_array_equal(fields['day_of_week'], expected.dt.dayofweek.to_numpy())
+        np.testing.assert_array_equal(fields['hour'], expected.dt.hour.to_numpy())
+
+    def test_timezone_aware_keeps_wall_time(self):
+        stamps = ['2023-03-01T10:00:00-08:00', '2023-03-05T23:30:00-08:00']
+        fields = feature_utils.split_datetimes(stamps)
+        expected = pd.to_datetime(pd.Series(stamps))
+        np.testing.assert_array_equal(fields['hour'], [10, 23])
+        np.testing.assert_array_equal(fields['hour'], expected.dt.hour.to_numpy())
+        np.testing.assert_array_equal(fields['day_of_week'], expected.dt.dayofweek.to_numpy())
+
+    def test_inference_frame_matches_training(self):
+        X = feature_utils.feature_frame([37.7798], [-122.4148], [23], feature_utils.encode_day_of_week(['Monday']))
+        self.assertEqual(list(X.columns), feature_utils.numeric_cols + feature_utils.cat_cols)
+        self.assertAlmostEqual(X['hour_sin'][0], np.sin(2 * np.pi * 23 / 24))
+        self.assertAlmostEqual(X['hour_cos'][0], np.cos(2 * np.pi * 23 / 24))
+        self.assertEqual(X['incident_day_of_week'][0], 'Monday')
+
+    def test_unknown_day_is_not_a_training_day(self):
+        codes = feature_utils.encode_day_of_week(['Funday', 'monday', None])
+        np.testing.assert_array_equal(codes, feature_utils.UNKNOWN_DAY_CODE)
+        X = feature_utils.feature_frame([37.0] * 3, [-122.0] * 3, [25] * 3, codes)
+        self.assertFalse(X['incident_day_of_week'].isna().any())
+        self.assertNotIn(X['incident_day_of_week'][0], feature_utils.DAY_NAMES)
+        self.assertAlmostEqual(X['hour_sin'][0], np.sin(2 * np.pi * 1 / 24))
+
+
+class TrainPredictTestCase(unittest.TestCase):
+    def setUp(self):
+        # A few busy and quiet cells over eight weeks, so all three risk tertiles exist
+        rng = np.random.default_rng(0)
+        n = 4000
+        start = np.datetime64('2024-01-01T00:00')
+        minutes = rng.integers(0, 8 * 7 * 24 * 60, n)
+        stamps = (start + minutes.astype('timedelta64[m]')).astype(str)
+        cells = rng.choice(6, n, p=[0.4, 0.25, 0.15, 0.1, 0.06, 0.04])
+        self.rows = [
+            {'latitude': str(37.770 + 0.002 * cell), 'longitude': str(-122.420), 'incident_datetime': stamp}
+            for cell, stamp in zip(cells, stamps)
+        ]
+
+    def test_train_and_predict(self):
+        response = mock.Mock()
+        response.json.return_value = self.rows
+        with mock.patch.object(model_utils.requests, 'get', return_value=response) as get, \
+                mock.patch.object(model_utils, 'pipe', None), \
+                mock.patch.object(model_utils, '_model_ready', False):
+            model_utils.train_model()
+            get.assert_called_once()
+            label = model_utils.predict_risk_label(37.770, -122.420, 23, 'Monday')
+            self.assertIn(label, (0, 1, 2))
+
+            # Unknown days one-hot encode to all zeros, as raw strings did before
+            preproc = model_utils.pipe.named_steps['preproc']
+            unknown = feature_utils.feature_frame([37.770], [-122.420], [23],
+                                                  feature_utils.encode_day_of_week(['Funday']))
+            encoded = preproc.transform(unknown)
+            encoded = encoded.toarray() if hasattr(encoded, 'toarray') else encoded
+            n_days = len(preproc.named_transformers_['cat'].named_steps['ohe'].categories_[0])
+            np.testing.assert_array_equal(encoded[0, -n_days:], 0)
+            self.assertIn(model_utils.predict_risk_label(37.770, -122.420, 23, 'Funday'), (0, 1, 2))
+
+if __name__ == '__main__':
+    unittest.main()